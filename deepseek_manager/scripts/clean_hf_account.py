@@ -1,85 +1,120 @@
-from huggingface_hub import HfApi
 from huggingface_hub.utils import RepositoryNotFoundError
 from tqdm import tqdm
 import argparse
-import time
+import asyncio
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.common import TokenBucket, get_hf_api
+
 def delete_all_repos(target_user: str, token: str, confirmation: str):
     """Enhanced repository deletion with proper ID handling"""
     if confirmation.lower() != "yes_delete_all":
         print("Aborted: Confirmation phrase not matched")
         return
 
-    api = HfApi()
+    api = get_hf_api()
+    # Stay under the HF API rate limit so deletes never hit the 429 path
+    rate_limiter = TokenBucket(rate=100/60)
     try:
         # Get all repository types
         repo_types = ['model', 'dataset', 'space']
+        list_funcs = {
+            'model': api.list_models,
+            'dataset': api.list_datasets,
+            'space': api.list_spaces
+        }
         total_repos = []
-        
-        for repo_type in repo_types:
+
+        def list_repos(repo_type):
+            """Consume one paginated listing endpoint into (name, type) pairs"""
             try:
-                if repo_type == 'model':
-                    repos = api.list_models(author=target_user)
-                elif repo_type == 'dataset':
-                    repos = api.list_datasets(author=target_user)
-                elif repo_type == 'space':
-                    repos = api.list_spaces(author=target_user)
-                
+                repos = list_funcs[repo_type](author=target_user)
                 # Extract just the repository name without namespace
-                total_repos.extend([
-                    (repo.id.split('/')[-1], repo_type) 
-                    for repo in repos
-                ])
-                
+                return [(repo.id.split('/')[-1], repo_type) for repo in repos]
             except Exception as e:
                 print(f"Error listing {repo_type}s: {str(e)}")
-                continue
+                return []
+
+        # The three listing endpoints are independent - overlap their
+        # paginated fetches instead of walking them one after another
+        with ThreadPoolExecutor(max_workers=len(repo_types)) as executor:
+            for repo_list in executor.map(list_repos, repo_types):
+                total_repos.extend(repo_list)
 
         if not total_repos:
             print("No repositories found")
             return
 
         print(f"Found {len(total_repos)} repositories to delete")
-        
-        # Delete with retry logic
-        for repo_name, repo_type in tqdm(total_repos, desc="Deleting repositories"):
-            try:
-                # Direct deletion without URL encoding
+
+        async def delete_one(repo_name, repo_type, semaphore):
+            """Delete one repo, backing off on rate limits without blocking a thread"""
+            loop = asyncio.get_running_loop()
+            async with semaphore:
+                error = None
                 for attempt in range(3):
                     try:
-                        api.delete_repo(
-                            repo_id=repo_name,
-                            repo_type=repo_type,
-                            token=token
-                        )
-                        break
+                        # HfApi is sync, so run the actual HTTP call in a
+                        # worker thread; the coroutine only holds a thread
+                        # for the duration of the request itself
+                        def do_delete():
+                            rate_limiter.acquire()
+                            api.delete_repo(
+                                repo_id=repo_name,
+                                repo_type=repo_type,
+                                token=token
+                            )
+                        await loop.run_in_executor(None, do_delete)
+                        return repo_name, repo_type, None
                     except Exception as e:
+                        error = e
                         if attempt == 2:
-                            raise
-                        time.sleep(1)
-                
-            except Exception as e:
-                print(f"\nFailed to delete {repo_name} ({repo_type}): {str(e)}")
-                continue
-            finally:
-                time.sleep(0.5)
-                
+                            break
+                        # While this coroutine backs off, the others keep
+                        # issuing deletes on the shared event loop
+                        if "429" in str(e):
+                            await asyncio.sleep(2 ** attempt + random.random())
+                        else:
+                            await asyncio.sleep(1)
+                return repo_name, repo_type, error
+
+        deleted = {}
+
+        async def delete_all():
+            semaphore = asyncio.Semaphore(16)
+            tasks = [delete_one(repo_name, repo_type, semaphore)
+                     for repo_name, repo_type in total_repos]
+            for coro in tqdm(asyncio.as_completed(tasks), total=len(tasks),
+                             desc="Deleting repositories"):
+                repo_name, repo_type, error = await coro
+                if error is None:
+                    deleted[(repo_name, repo_type)] = True
+                else:
+                    deleted[(repo_name, repo_type)] = False
+                    print(f"\nFailed to delete {repo_name} ({repo_type}): {str(error)}")
+
+        asyncio.run(delete_all())
+
         print("Deletion process completed. Verifying...")
-        
-        # Final verification
+
+        # Final verification - only re-check the repos whose deletion
+        # raised, instead of re-walking all three listing endpoints
         remaining = []
-        for repo_type in repo_types:
+        for (repo_name, repo_type), ok in deleted.items():
+            if ok:
+                continue
             try:
-                if repo_type == 'model':
-                    remaining.extend(api.list_models(author=target_user))
-                elif repo_type == 'dataset':
-                    remaining.extend(api.list_datasets(author=target_user))
-                elif repo_type == 'space':
-                    remaining.extend(api.list_spaces(author=target_user))
+                if api.repo_exists(f"{target_user}/{repo_name}", repo_type=repo_type, token=token):
+                    remaining.append((repo_name, repo_type))
             except:
                 pass
-                
+
         if remaining:
             print(f"Warning: {len(remaining)} repositories could not be deleted")
         else:
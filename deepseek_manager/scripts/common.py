@@ -1,3 +1,4 @@
+import functools
 import subprocess
 import os
 from pathlib import Path
@@ -5,6 +6,11 @@ from typing import List
 
 REPOS_DIR = "deepseek_storage/extracted"
 
+@functools.lru_cache(maxsize=4096)
+def safe_repo_name(repo_id: str) -> str:
+    """Filesystem-safe name for a repo id (namespace slash -> underscore)"""
+    return repo_id.replace("/", "_")
+
 def get_archive_format(path):
     """Detect archive format from file extension"""
     if str(path).endswith(".zip"):
@@ -16,31 +22,51 @@ def get_archive_format(path):
 
 def validate_repo(repo_path):
     """More comprehensive validation of extracted repository"""
-    required_git_files = [
+    required_entries = {
         "HEAD",
         "config",
         "description",
-        "info/exclude"
-    ]
-    
-    # Check basic git structure
+        "objects",
+        "refs",
+        "hooks",
+        "info"
+    }
+
     git_dir = repo_path / ".git"
-    if not git_dir.exists():
+    try:
+        # One directory read instead of a stat call per required entry
+        with os.scandir(git_dir) as entries:
+            names = {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
         return False
-        
-    # Check critical git components
-    checks = [
-        (git_dir / "objects").exists(),
-        (git_dir / "refs").exists(),
-        any((git_dir / "hooks").iterdir())  # At least some hook samples
-    ]
-    
-    # Check required files
-    for f in required_git_files:
-        if not (git_dir / f).exists():
-            return False
-            
-    return all(checks)
+
+    if not required_entries <= names:
+        return False
+
+    # Nested file check only runs once the cheap set test passes
+    if not (git_dir / "info" / "exclude").exists():
+        return False
+
+    # At least some hook samples - stop at the first dirent
+    with os.scandir(git_dir / "hooks") as hooks:
+        return next(hooks, None) is not None
+
+def validate_all(repo_paths):
+    """Validate many extracted repos concurrently.
+
+    Validation is pure filesystem I/O, so oversubscribing the pool well
+    past the core count keeps the disk queue full.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    repo_paths = list(repo_paths)
+    if not repo_paths:
+        return {}
+
+    workers = min(len(repo_paths), (os.cpu_count() or 4) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(validate_repo, repo_paths)
+        return dict(zip(repo_paths, results))
 
 def create_archive(repo_path, output_path):
     """Create self-contained Git bundle with LFS objects"""
@@ -76,13 +102,27 @@ class RepoManager:
 
     def get_archive_path(self, repo_id: str) -> Path:
         """Get path for bundle file"""
-        safe_name = repo_id.replace("/", "_") + ".bundle"
+        safe_name = safe_repo_name(repo_id) + ".bundle"
         return Path(self.archives_dir) / safe_name
 
     def get_downloaded_repos(self) -> List[str]:
         """Get list of downloaded repositories"""
-        return [f.stem for f in Path(self.archives_dir).glob("*.bundle")]
+        # os.scandir reads the directory in one pass without the per-entry
+        # stat calls and Path construction that glob() does; the suffix
+        # lengths are computed once rather than per entry. --compress
+        # downloads land as .bundle.zst, so both spellings count
+        zst_cut = len(".bundle.zst")
+        cut = len(".bundle")
+        repos = []
+        with os.scandir(self.archives_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".bundle.zst"):
+                    repos.append(name[:-zst_cut])
+                elif name.endswith(".bundle"):
+                    repos.append(name[:-cut])
+        return repos
 
     def get_extraction_path(self, repo_id: str) -> Path:
-        safe_name = repo_id.replace("/", "_")
+        safe_name = safe_repo_name(repo_id)
         return Path(self.extracted_dir) / safe_name 
\ No newline at end of file
@@ -1,284 +1,533 @@
 import sys
 import os
 import json
+import atexit
 import datetime
+import fnmatch
+import hashlib
+import queue
+import threading
+import uuid
 from typing import List, Dict, Tuple
 import subprocess
 from pathlib import Path
+import tarfile
 import tempfile
 import argparse
-from concurrent.futures import ThreadPoolExecutor
-from tqdm import tqdm
-from concurrent.futures import as_completed
-from huggingface_hub import HfApi
 import shutil
 
+# Heavy third-party imports (huggingface_hub, tqdm) are deferred to
+# main() so argparse paths like --help don't pay their import cost
+# and ensure_dependencies can run before anything is imported
+
 def ensure_dependencies():
     """Ensure all required packages are installed."""
+    import importlib.metadata
+
     required_packages = [
         'requests',
         'tqdm',
         'huggingface_hub',
+        'hf_transfer',
         'typing-extensions'
     ]
-    
+
+    # Skip everything if a previous run already verified this
+    # environment. The sentinel is keyed on the interpreter prefix so a
+    # fresh venv doesn't inherit another environment's verdict and skip
+    # the very check that would install its packages
+    env_tag = hashlib.sha256(sys.prefix.encode()).hexdigest()[:16]
+    sentinel = (Path.home() / ".cache" / "deepseek_manager"
+                / f".deps_ok.{env_tag}")
+    if sentinel.exists():
+        return
+
     for package in required_packages:
         try:
-            __import__(package)
-        except ImportError:
+            # Metadata lookup only - doesn't import/execute the package
+            importlib.metadata.distribution(package)
+        except importlib.metadata.PackageNotFoundError:
             print(f"\n{package} is required. Installing...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", package])
             print(f"Successfully installed {package}")
-    
+
     # Check if Git is installed
     try:
-        subprocess.run(['git', '--version'], check=True, 
+        subprocess.run(['git', '--version'], check=True,
                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except:
         print("\nGit is not installed. Please install Git to proceed.")
         print("Visit https://git-scm.com/downloads")
         sys.exit(1)
 
+    sentinel.parent.mkdir(parents=True, exist_ok=True)
+    sentinel.touch()
+
 def main():
-    # First ensure all dependencies are installed
-    print("Checking dependencies...")
-    ensure_dependencies()
-    
-    # Now import the required packages
-    from huggingface_hub import HfApi, hf_hub_download, snapshot_download
-    from huggingface_hub.utils import RepositoryNotFoundError, RevisionNotFoundError
-    
-    # Add parent directory to path to import utils
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from utils.common import RepoManager
-    
-    # Update argument parser configuration
+    # Parse arguments before anything heavy so --help and usage errors
+    # exit on argparse alone, without the dependency check or the
+    # third-party imports below
     parser = argparse.ArgumentParser(description="Download DeepSeek repositories")
     parser.add_argument("--workers", type=int, default=20,
                        help="Number of parallel download workers")
     parser.add_argument("--repo", nargs="+", default=["deepseek-ai/deepseek-coder-1.3b-instruct"],
                        help="Specific repositories to download (space-separated)")
-    
+    parser.add_argument("--snapshot", action="store_true",
+                       help="Download file snapshots via hf_transfer instead of git bundles "
+                            "(faster for large LFS repos, but produces tarballs without history)")
+    parser.add_argument("--compress", action="store_true",
+                       help="Pipe bundles through zstd -T0 so they land compressed "
+                            "(.bundle.zst); extract_repos decompresses transparently")
+    parser.add_argument("--lfs-include", nargs="+", metavar="PATTERN",
+                       help="Only fetch LFS objects matching these glob patterns "
+                            "(e.g. '*.safetensors' 'tokenizer*'); default fetches all")
+
     args = parser.parse_args()
-    manager = RepoManager()
-    
+
+    # Now ensure all dependencies are installed
+    print("Checking dependencies...")
+    ensure_dependencies()
+
+    # Enable the Rust multi-connection downloader - must be set before
+    # huggingface_hub is imported
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+    # Now import the required packages
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from tqdm import tqdm
+    from huggingface_hub import snapshot_download
+    from huggingface_hub.utils import RepositoryNotFoundError, RevisionNotFoundError
+
+    # Add parent directory to path to import utils
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.common import (RepoManager, TokenBucket, git_cmd,
+                              safe_repo_name, get_hf_api, get_http_session)
+
+    # Size the connection pool to the worker count so concurrent HF
+    # calls reuse TCP+TLS connections instead of re-handshaking
+    manager = RepoManager(pool_size=args.workers * 2)
+
+    # Keep HF API calls under the rate limit instead of eating 429 retries
+    rate_limiter = TokenBucket(rate=100/60)
+
+    def get_deepseek_repos():
+        """Stream DeepSeek repositories from Hugging Face.
+
+        Returns a lazy generator - later pages are fetched while earlier
+        entries are already being processed, and any listing error
+        surfaces in the producer thread that iterates it.
+        """
+        return get_hf_api().list_models(author="deepseek-ai")
+
     # Handle repository selection
     if args.repo:
-        # Fetch detailed info for specified repos
-        api = HfApi()
-        repos = []
-        for rid in args.repo:
+        # Fetch detailed info for specified repos - each call is a
+        # blocking HTTPS round-trip, so overlap them in a pool
+        api = get_hf_api()
+
+        def fetch_info(rid):
             try:
-                model_info = api.model_info(rid)
-                repos.append(model_info)
+                rate_limiter.acquire()
+                # files_metadata also populates per-file LFS status, which
+                # saves a per-repo probe later in download_repo
+                return api.model_info(rid, files_metadata=True)
             except RepositoryNotFoundError:
                 print(f"Repository {rid} not found, skipping.")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(20, len(args.repo))) as executor:
+            repos = [info for info in executor.map(fetch_info, args.repo) if info]
         print(f"Downloading {len(repos)} specified repositories...")
     else:
-        # Get full Model objects from API
-        repos = get_repo_list()
-        print(f"Downloading all {len(repos)} repositories...")
-    
-    # Calculate repository sizes and sort
+        # Stream Model objects from the API without waiting for the
+        # full paginated listing up front
+        repos = get_deepseek_repos()
+        print("Downloading all deepseek-ai repositories...")
+
+    # The sizing pass runs as a producer thread feeding a priority
+    # queue, so the smallest known repo starts downloading while
+    # metadata for the rest is still arriving. LFS status and per-file
+    # checksums are recorded in the same pass from the sibling metadata
+    # we already have
     repo_sizes = []
-    for repo in repos:
-        try:
-            # Handle potential None values in size fields
-            total_size = sum((sibling.size or 0) for sibling in repo.siblings)
-            repo_sizes.append((repo.modelId, total_size))
-        except Exception as e:
-            print(f"Error calculating size for {repo.modelId}: {str(e)}")
-            repo_sizes.append((repo.modelId, 0))
-    
-    # Sort by size ascending (smallest first)
-    repo_sizes.sort(key=lambda x: x[1])
-    
-    print("\nRepositories sorted by size:")
-    for repo_id, size in repo_sizes:
-        print(f"- {repo_id}: {size/1024**3:.2f} GB")
+    lfs_map = {}
+    lfs_sha_map = {}
+    size_queue = queue.PriorityQueue()
+    end_of_metadata = (float("inf"), None)
 
-    def get_deepseek_repos() -> List[Dict]:
-        """Fetch list of DeepSeek repositories from Hugging Face."""
-        api = HfApi()
+    def produce_sizes():
         try:
-            # Get all models from deepseek-ai
-            repos = api.list_models(author="deepseek-ai")
-            repo_list = list(repos)
-            print(f"\nFound {len(repo_list)} total repositories")
-            return repo_list
+            for repo in repos:
+                total_size = 0
+                has_lfs = False
+                lfs_shas = {}
+                try:
+                    for sibling in repo.siblings:
+                        # Handle potential None values in size fields
+                        total_size += sibling.size or 0
+                        lfs = getattr(sibling, "lfs", None)
+                        if lfs is None:
+                            continue
+                        has_lfs = True
+                        sha = getattr(lfs, "sha256", None)
+                        if sha:
+                            lfs_shas[sibling.rfilename] = sha
+                    lfs_map[repo.modelId] = has_lfs
+                    if lfs_shas:
+                        lfs_sha_map[repo.modelId] = lfs_shas
+                except Exception as e:
+                    print(f"Error calculating size for {repo.modelId}: {str(e)}")
+                    total_size = 0
+                repo_sizes.append((repo.modelId, total_size))
+                size_queue.put((total_size, repo.modelId))
         except Exception as e:
             print(f"Error fetching repository list: {str(e)}")
-            return []
+        finally:
+            # Always unblock the consumer - without the sentinel a
+            # listing failure would leave main waiting on the queue
+            size_queue.put(end_of_metadata)
 
-    def check_lfs_usage(repo_id: str) -> Dict:
-        """Check if repository uses Git LFS by looking for .gitattributes."""
-        try:
-            # Try to download just the .gitattributes file
-            attrs_content = hf_hub_download(
-                repo_id=repo_id,
-                filename=".gitattributes",
-                repo_type="model"
-            )
-            
-            has_lfs = False
-            lfs_patterns = []
-            
-            with open(attrs_content, 'r') as f:
-                for line in f:
-                    if "filter=lfs" in line:
-                        has_lfs = True
-                        pattern = line.split()[0]
-                        lfs_patterns.append(pattern)
-            
-            return {
-                "has_lfs": has_lfs,
-                "lfs_patterns": lfs_patterns
-            }
-        except:
-            return {"has_lfs": False, "lfs_patterns": []}
+    producer = threading.Thread(target=produce_sizes, daemon=True)
+    producer.start()
 
-    def safe_delete(path: Path):
-        """Robust deletion for both files and directories"""
-        from time import sleep
-        
-        def on_error(func, path, exc_info):
-            os.chmod(path, 0o777)
+    def _verify(path, expected: str) -> bool:
+        """Check a downloaded file against its upstream SHA-256."""
+        with open(path, "rb") as f:
             try:
-                func(path)
-            except Exception as e:
-                print(f"Retry failed for {path}: {str(e)}")
+                # file_digest hashes straight from the file descriptor in
+                # C, so OpenSSL's SHA-NI path runs without a Python loop
+                digest = hashlib.file_digest(f, "sha256")
+            except AttributeError:
+                # Python < 3.11: 1 MiB chunks amortize per-update overhead
+                digest = hashlib.sha256()
+                while chunk := f.read(1 << 20):
+                    digest.update(chunk)
+        return digest.hexdigest() == expected
+
+    lfs_usage_cache = {}
 
-        for _ in range(3):
+    def check_lfs_usage(repo_id: str, clone_path=None) -> Dict:
+        """Check if repository uses Git LFS by parsing .gitattributes."""
+        if repo_id in lfs_usage_cache:
+            return lfs_usage_cache[repo_id]
+
+        attrs_content = None
+        if clone_path is not None:
+            # Read straight out of the local bare clone - no network round-trip
             try:
-                if not path.exists():
-                    return
-                
-                if path.is_dir():
-                    shutil.rmtree(path, onerror=on_error)
-                else:
-                    path.unlink()
-                return
-            except Exception as e:
-                print(f"Warning: Error deleting {path} - {str(e)}")
-                sleep(1)
-
-    def download_repository(repo_id, save_path):
-        """Create bundles with dynamic branch detection"""
-        repo_url = f"https://huggingface.co/{repo_id}"
-        
-        save_path = Path(save_path)
-        save_path.mkdir(parents=True, exist_ok=True)
-        bundle_path = save_path / f"{repo_id.replace('/', '_')}.bundle"
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
+                attrs_content = subprocess.check_output(
+                    ["git", "-C", str(clone_path), "show", "HEAD:.gitattributes"],
+                    text=True, stderr=subprocess.DEVNULL
+                )
+            except subprocess.CalledProcessError:
+                attrs_content = ""
+
+        if attrs_content is None:
+            # No local clone available - stream the raw file over HTTP
+            # and parse it in memory instead of writing it into the HF
+            # cache on disk. The shared session keeps the TLS connection
+            # (and auth headers) alive across repos
             try:
-                # Clone without specifying branch first
-                subprocess.run([
-                    "git", "clone",
-                    "--bare",
-                    repo_url,
-                    temp_dir
-                ], check=True, shell=True)
-                
-                # Get default branch name
-                branch_name = subprocess.check_output(
-                    ["git", "-C", temp_dir, "symbolic-ref", "--short", "HEAD"],
-                    text=True
-                ).strip()
-                
-                # Create bundle with detected branch
-                subprocess.run([
-                    "git", "-C", temp_dir,
-                    "bundle", "create", str(bundle_path),
-                    "--all",
-                    "--tags",
-                    f"refs/heads/{branch_name}"
-                ], check=True, shell=True)
-                
-                return True
-            except subprocess.CalledProcessError as e:
-                print(f"Bundle creation failed: {e.stderr}")
-                if bundle_path.exists():
-                    bundle_path.unlink()
-                return False
+                rate_limiter.acquire()
+                response = get_http_session().get(
+                    f"https://huggingface.co/{repo_id}/raw/main/.gitattributes",
+                    timeout=10, stream=True
+                )
+                response.raise_for_status()
+                attrs_content = "\n".join(
+                    line for line in response.iter_lines(decode_unicode=True)
+                    if line
+                )
+            except:
+                attrs_content = ""
+
+        lfs_patterns = [
+            line.split()[0]
+            for line in attrs_content.splitlines()
+            if "filter=lfs" in line
+        ]
+
+        result = {
+            "has_lfs": bool(lfs_patterns),
+            "lfs_patterns": lfs_patterns
+        }
+        lfs_usage_cache[repo_id] = result
+        return result
+
+    # Deletions stay off the critical path: the doomed tree is renamed
+    # aside first (atomic and instant even while AV/indexers hold files
+    # open on Windows), then ground down by a background thread. The
+    # atexit drain makes sure nothing is left half-deleted on exit
+    _async_deleter = ThreadPoolExecutor(max_workers=2)
+    atexit.register(_async_deleter.shutdown)
+
+    def safe_delete(path: Path):
+        """Move a file or directory out of the way and delete it asynchronously"""
+        if not path.exists():
+            return
+        if not path.is_dir():
+            path.unlink(missing_ok=True)
+            return
+        doomed = path.with_name(path.name + ".del." + uuid.uuid4().hex)
+        try:
+            os.replace(path, doomed)
+        except OSError:
+            doomed = path  # rename refused - fall back to deleting in place
+        _async_deleter.submit(shutil.rmtree, doomed, ignore_errors=True)
 
     def download_repo(repo_id: str, repo_manager: RepoManager) -> bool:
         """Download a single repository with LFS support"""
-        temp_dir = Path(tempfile.mkdtemp())
+        # Persistent bare cache shared with the mirror workflow: the
+        # first run clones, later runs only fetch the delta
+        cache_dir = Path(repo_manager.get_bare_cache_path(repo_id))
         try:
             repo_url = f"https://huggingface.co/{repo_id}"
             archive_path = repo_manager.get_archive_path(repo_id)
-            
-            # Clone bare repository
-            subprocess.run(["git", "clone", "--bare", repo_url, str(temp_dir)], check=True)
-            
-            # Fetch LFS objects in bare repo
-            subprocess.run(["git", "-C", str(temp_dir), "lfs", "fetch", "--all", "origin"], check=True)
-            
-            # Check for LFS usage
-            has_lfs = False
-            result = subprocess.run(["git", "-C", str(temp_dir), "lfs", "ls-files"], 
-                                  capture_output=True, text=True)
-            has_lfs = len(result.stdout.strip()) > 0
-
-            # Create archives
-            create_archive(temp_dir, archive_path)
-            
+
+            if cache_dir.exists():
+                # Bare clones record no fetch refspec, so a plain fetch
+                # only moves FETCH_HEAD and re-runs would bundle stale
+                # refs. Fetching the mirror refspec explicitly advances
+                # every local ref (and repairs caches created before the
+                # switch to --mirror clones below)
+                subprocess.run(git_cmd(
+                    "-C", str(cache_dir), "fetch", "--prune", "origin",
+                    "+refs/*:refs/*"
+                ), check=True)
+            else:
+                # --mirror keeps every ref with the mirror refspec
+                # configured - matching what bundle --all --tags ships
+                # and what the mirror workflow pushes from this cache
+                clone_args = ["clone", "--mirror"]
+                if lfs_map.get(repo_id) is False:
+                    # No LFS: partial-clone so blobs are fetched lazily and
+                    # blobs unreachable from bundled refs never transfer.
+                    # LFS repos keep the full clone - their git blobs are
+                    # tiny pointer files, and skipping them would just add
+                    # lazy-fetch round-trips during bundle creation
+                    clone_args.append("--filter=blob:none")
+                subprocess.run(git_cmd(
+                    *clone_args, repo_url, str(cache_dir)
+                ), check=True)
+
+            # Fetch LFS objects in bare repo. With --lfs-include, narrow
+            # the fetch via lfs.fetchinclude so only the wanted variants
+            # transfer instead of every object across every ref; the
+            # pattern list is resolved against the sibling filenames when
+            # the sizing pass recorded them
+            if args.lfs_include:
+                known = lfs_sha_map.get(repo_id)
+                if known:
+                    include = ",".join(
+                        name for name in known
+                        if any(fnmatch.fnmatch(name, pat)
+                               for pat in args.lfs_include)
+                    ) or ",".join(args.lfs_include)
+                else:
+                    include = ",".join(args.lfs_include)
+                subprocess.run(git_cmd(
+                    "-C", str(cache_dir),
+                    "-c", f"lfs.fetchinclude={include}",
+                    "lfs", "fetch", "origin"
+                ), check=True)
+            else:
+                subprocess.run(git_cmd(
+                    "-C", str(cache_dir), "lfs", "fetch", "--all", "origin"
+                ), check=True)
+
+            # LFS status comes from the sibling metadata fetched during
+            # the sizing pass; the .gitattributes parse only runs when
+            # the pattern list is actually needed (or status is unknown)
+            has_lfs = lfs_map.get(repo_id)
+            if has_lfs is False:
+                lfs_info = {"has_lfs": False, "lfs_patterns": []}
+            else:
+                lfs_info = check_lfs_usage(repo_id, cache_dir)
+                has_lfs = lfs_info["has_lfs"]
+
+            # Stream the bundle to disk, hashing and sizing it in the same
+            # pass instead of re-reading the file once it's written. With
+            # --compress the stream goes through zstd first, so the pack
+            # never lands uncompressed and zstd runs on all cores while
+            # git is still packing
+            bundle_hash = hashlib.sha256()
+            bundle_size = 0
+            bundle_target = archive_path + ".zst" if args.compress else archive_path
+            try:
+                with open(bundle_target, "wb") as bundle_file:
+                    proc = subprocess.Popen([
+                        "git", "-C", str(cache_dir),
+                        "bundle", "create", "-",
+                        "--all", "--tags"
+                    ], stdout=subprocess.PIPE)
+                    zstd = None
+                    stream = proc.stdout
+                    if args.compress:
+                        zstd = subprocess.Popen(["zstd", "-T0"],
+                                                stdin=proc.stdout,
+                                                stdout=subprocess.PIPE)
+                        proc.stdout.close()
+                        stream = zstd.stdout
+                    for chunk in iter(lambda: stream.read(1 << 20), b""):
+                        bundle_file.write(chunk)
+                        bundle_hash.update(chunk)
+                        bundle_size += len(chunk)
+                    if zstd is not None and zstd.wait() != 0:
+                        raise subprocess.CalledProcessError(zstd.returncode, "zstd")
+                    if proc.wait() != 0:
+                        raise subprocess.CalledProcessError(proc.returncode, "git bundle create")
+            except Exception:
+                # A pipeline that dies mid-stream leaves a truncated
+                # bundle behind, which the listing would then report as
+                # downloaded - remove it before surfacing the failure
+                Path(bundle_target).unlink(missing_ok=True)
+                raise
+
+            if has_lfs:
+                # Companion LFS bundle so extraction works fully offline
+                subprocess.run([
+                    "git", "-C", str(cache_dir),
+                    "lfs", "bundle", "create", str(archive_path) + ".lfs",
+                    "--all"
+                ], check=True)
+
             # Save metadata
             metadata = {
                 "repo_id": repo_id,
-                "timestamp": datetime.now().isoformat(),
+                "size": bundle_size,
+                "sha256": bundle_hash.hexdigest(),
+                "compressed": args.compress,
+                "download_date": datetime.datetime.now().isoformat(),
                 "lfs_info": {
                     "has_lfs": has_lfs,
+                    "lfs_patterns": lfs_info["lfs_patterns"],
                     "lfs_bundle": has_lfs  # Always create LFS bundle if repo uses LFS
                 }
             }
             with open(str(archive_path) + ".meta.json", "w") as f:
                 json.dump(metadata, f)
-            
-            return True
+
+            return metadata
         except Exception as e:
             print(f"Failed to download {repo_id}: {str(e)}")
-            return False
+            return None
+
+    def snapshot_repo(repo_id: str, repo_manager: RepoManager) -> Dict:
+        """Download a file snapshot with hf_transfer and pack it as a tarball.
+
+        Skips git entirely: hf_transfer opens several range-request
+        connections per file, so large LFS repos download at NIC speed
+        instead of being capped by a single git connection.
+        """
+        temp_dir = workspace_dir / safe_repo_name(repo_id)
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            snapshot_download(repo_id=repo_id, local_dir=str(temp_dir),
+                              max_workers=8, etag_timeout=30)
+
+            # Verify the large files against the checksums the sizing
+            # pass already collected - catches truncated transfers before
+            # they get baked into an archive
+            for rel_name, sha in lfs_sha_map.get(repo_id, {}).items():
+                file_path = temp_dir / rel_name
+                if file_path.exists() and not _verify(file_path, sha):
+                    raise ValueError(f"Checksum mismatch for {rel_name}")
+
+            archive_path = os.path.join(repo_manager.archives_dir,
+                                        safe_repo_name(repo_id) + ".tar.gz")
+            with tarfile.open(archive_path, "w:gz") as tar:
+                tar.add(str(temp_dir), arcname=safe_repo_name(repo_id))
+
+            # Member index sidecar: verification can answer structure
+            # questions from this without gunzipping the archive
+            index = [
+                [f"{safe_repo_name(repo_id)}/{p.relative_to(temp_dir).as_posix()}",
+                 p.stat().st_size]
+                for p in sorted(temp_dir.rglob("*")) if p.is_file()
+            ]
+            with open(archive_path + ".idx", "w") as f:
+                json.dump(index, f)
+
+            metadata = {
+                "repo_id": repo_id,
+                "size": os.path.getsize(archive_path),
+                "sha256": repo_manager.calculate_file_hash(archive_path),
+                "download_date": datetime.datetime.now().isoformat(),
+                # LFS files are materialized in the snapshot, so there is
+                # no pointer bookkeeping to carry over
+                "lfs_info": {
+                    "has_lfs": False,
+                    "lfs_patterns": [],
+                    "lfs_bundle": False
+                }
+            }
+            with open(archive_path + ".meta.json", "w") as f:
+                json.dump(metadata, f)
+
+            return metadata
+        except Exception as e:
+            print(f"Failed to snapshot {repo_id}: {str(e)}")
+            return None
         finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
-    
-    def download_repo_wrapper(repo_id: str, repo_manager: RepoManager) -> Tuple[bool, str]:
+            safe_delete(temp_dir)
+
+    def download_repo_wrapper(repo_id: str, repo_manager: RepoManager) -> Tuple[Dict, str]:
         try:
-            result = download_repo(repo_id, repo_manager)
-            return (result, repo_id)
+            rate_limiter.acquire()
+            downloader = snapshot_repo if args.snapshot else download_repo
+            metadata = downloader(repo_id, repo_manager)
+            return (metadata, repo_id)
         except Exception as e:
             print(f"Error in {repo_id}: {str(e)}")
-            return (False, repo_id)
+            return (None, repo_id)
 
     print(f"\nStarting downloads with {args.workers} parallel workers...")
-    
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        futures = []
-        # Process repositories in size-sorted order
-        for repo_id, _ in repo_sizes:
-            futures.append(executor.submit(download_repo_wrapper, repo_id, manager))
-        
-        successful = 0
-        failed = 0
-        lfs_repos = 0
-        for future in tqdm(as_completed(futures), total=len(futures), desc="Overall Progress"):
-            result, repo_id = future.result()
-            if result:
-                successful += 1
-                # Check LFS status
-                meta_path = manager.get_archive_path(repo_id) + ".meta.json"
-                if os.path.exists(meta_path):
-                    with open(meta_path) as f:
-                        metadata = json.load(f)
-                        if metadata.get("lfs_info", {}).get("has_lfs", False):
-                            lfs_repos += 1
-            else:
-                failed += 1
-    
+
+    # One shared workspace for the whole run; workers clone into
+    # per-repo subdirs and only tear down their own subdir
+    with tempfile.TemporaryDirectory(prefix="deepseek_downloads_") as workspace:
+        workspace_dir = Path(workspace)
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = []
+            # Pop the smallest-known repo as soon as its size arrives -
+            # downloads overlap the rest of the metadata phase
+            while True:
+                size, repo_id = size_queue.get()
+                if repo_id is None:
+                    break
+                futures.append(executor.submit(download_repo_wrapper, repo_id, manager))
+            producer.join()
+
+            print(f"\nFound {len(repo_sizes)} total repositories")
+            print("\nRepositories sorted by size:")
+            for repo_id, size in sorted(repo_sizes, key=lambda x: x[1]):
+                print(f"- {repo_id}: {size/1024**3:.2f} GB")
+
+            successful = 0
+            failed = 0
+            lfs_repos = 0
+            manifest = {}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Overall Progress"):
+                metadata, repo_id = future.result()
+                if metadata:
+                    successful += 1
+                    manifest[repo_id] = metadata
+                    # LFS status comes straight from the worker - no need
+                    # to reopen the sidecar we just wrote
+                    if metadata.get("lfs_info", {}).get("has_lfs", False):
+                        lfs_repos += 1
+                else:
+                    failed += 1
+
+    # One consolidated manifest for everything downloaded this run
+    if manifest:
+        manifest_path = os.path.join(manager.archives_dir, "manifest.json")
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
     print("\nDownload Summary:")
     print("----------------")
-    print(f"Total repositories found: {len(repos)}")
+    print(f"Total repositories found: {len(repo_sizes)}")
     print(f"Successfully downloaded: {successful}")
     print(f"Failed downloads: {failed}")
     print(f"Repositories using Git LFS: {lfs_repos}")
@@ -3,6 +3,7 @@ import os
 import tarfile
 import subprocess
 from typing import List
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 
 # Add parent directory to path to import utils
@@ -11,14 +12,29 @@ from utils.common import RepoManager
 
 def extract_archive(archive_path: str, extract_path: str) -> bool:
     """Extract a git bundle to the specified path."""
+    archive_path = str(archive_path)
+    compressed = None
+    if not os.path.exists(archive_path) and os.path.exists(archive_path + ".zst"):
+        compressed = archive_path + ".zst"
     try:
+        if compressed:
+            # git clone can't read a bundle from a pipe, so materialize
+            # the bundle next to the archive for the duration of the clone
+            subprocess.run([
+                "zstd", "-d", "-f", "-o", archive_path, compressed
+            ], check=True)
         subprocess.run([
             "git", "clone", str(archive_path), str(extract_path)
         ], check=True)
         return True
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        # FileNotFoundError covers a missing zstd binary - count the
+        # repo as failed instead of killing the whole run
         print(f"Error extracting {archive_path}: {str(e)}")
         return False
+    finally:
+        if compressed and os.path.exists(archive_path):
+            os.remove(archive_path)
 
 def main():
     repo_manager = RepoManager()
@@ -33,22 +49,37 @@ def main():
     successful = 0
     failed = 0
     skipped = 0
-    
-    for repo_id in tqdm(downloaded_repos, desc="Extracting repositories"):
-        archive_path = repo_manager.get_archive_path(repo_id)
-        extract_path = repo_manager.get_extraction_path(repo_id)
-        
-        if os.path.exists(extract_path):
+
+    # Filter already-extracted repos up front so no worker is wasted
+    todo = []
+    for repo_id in downloaded_repos:
+        if os.path.exists(repo_manager.get_extraction_path(repo_id)):
             print(f"Skipping {repo_id} - already extracted")
             skipped += 1
-            continue
-        
-        if extract_archive(archive_path, extract_path):
-            successful += 1
         else:
-            failed += 1
-            if os.path.exists(extract_path):
-                os.rmdir(extract_path)
+            todo.append(repo_id)
+
+    # Bundle extraction is dominated by pack delta resolution, which is
+    # CPU-bound and independent per repo - one worker per core
+    if todo:
+        workers = min(len(todo), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(extract_archive,
+                                repo_manager.get_archive_path(repo_id),
+                                repo_manager.get_extraction_path(repo_id)): repo_id
+                for repo_id in todo
+            }
+            for future in tqdm(as_completed(futures), total=len(futures),
+                               desc="Extracting repositories"):
+                repo_id = futures[future]
+                if future.result():
+                    successful += 1
+                else:
+                    failed += 1
+                    extract_path = repo_manager.get_extraction_path(repo_id)
+                    if os.path.exists(extract_path):
+                        os.rmdir(extract_path)
     
     print("\nExtraction complete!")
     print(f"Successfully extracted: {successful}")
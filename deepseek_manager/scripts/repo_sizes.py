@@ -1,43 +1,52 @@
 #!/usr/bin/env python3
+import math
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 from huggingface_hub import HfApi, ModelInfo
 from tqdm import tqdm
 import argparse
 
+UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
 def get_human_size(size_bytes: int) -> str:
     """Convert bytes to human-readable format"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.2f} PB"
+    # Pick the unit in one log2 instead of a divide loop; this also
+    # keeps values just under a unit boundary in the right unit
+    i = 0 if size_bytes < 1 else min(int(math.log2(size_bytes) // 10),
+                                     len(UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * i)):.2f} {UNITS[i]}"
 
 def get_deepseek_repo_sizes(sort_by: str = 'asc') -> List[Tuple[str, int]]:
     """Get list of DeepSeek repositories with their sizes from Hugging Face"""
     api = HfApi()
-    repos = api.list_models(author="deepseek-ai")
-    
-    repo_sizes = []
-    for repo in tqdm(repos, desc="Fetching repository sizes"):
+    repos = list(api.list_models(author="deepseek-ai"))
+
+    def fetch_size(repo):
         try:
             # Get full model info with file metadata
             full_info = api.model_info(repo.modelId, files_metadata=True)
-            
+
             # Calculate total size from all files
             total_size = sum(
-                (sibling.size or 0) 
+                (sibling.size or 0)
                 for sibling in full_info.siblings
                 if sibling.rfilename not in ['.gitattributes', 'README.md']
             )
-            
-            if total_size > 0:
-                repo_sizes.append((repo.modelId, total_size))
-                
+            return (repo.modelId, total_size)
         except Exception as e:
             print(f"\nError processing {repo.modelId}: {str(e)}")
-            continue
-    
+            return None
+
+    # Each model_info call is a blocking HTTPS round-trip; 20 in flight
+    # keeps the phase I/O-bound without tripping HF rate limits
+    repo_sizes = []
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        for result in tqdm(executor.map(fetch_size, repos), total=len(repos),
+                           desc="Fetching repository sizes"):
+            if result and result[1] > 0:
+                repo_sizes.append(result)
+
     # Sort by size (ascending or descending)
     reverse_sort = sort_by.lower() == 'desc'
     repo_sizes.sort(key=lambda x: x[1], reverse=reverse_sort)
@@ -1,5 +1,7 @@
 import argparse
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from threading import Thread
+from transformers import (AutoModelForCausalLM, AutoTokenizer,
+                          BitsAndBytesConfig, TextIteratorStreamer)
 import torch
 
 def main():
@@ -16,39 +18,84 @@ def main():
     args = parser.parse_args()
     model_path = f"deepseek_storage/extracted/{args.model}"
     
+    # TF32 matmuls are ~2x faster on Ampere+ with no accuracy cost here
+    if torch.cuda.is_available():
+        torch.backends.cuda.matmul.allow_tf32 = True
+
     # Load model with quantization
     load_kwargs = {
         "device_map": "auto",
         "trust_remote_code": True
     }
-    
+
     if args.quant == "4bit":
-        load_kwargs.update({
-            "load_in_4bit": True,
-            "bnb_4bit_compute_dtype": torch.float16
-        })
+        # NF4 + double quantization beats the default fp4 path at the
+        # same bit width, and bf16 compute keeps the dequant matmuls fast
+        load_kwargs["quantization_config"] = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_use_double_quant=True,
+            bnb_4bit_compute_dtype=torch.bfloat16
+        )
     elif args.quant == "8bit":
-        load_kwargs["load_in_8bit"] = True
-    
-    model = AutoModelForCausalLM.from_pretrained(model_path, **load_kwargs)
+        load_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+
+    # Prefer the fused FlashAttention-2 kernel, falling back to SDPA
+    # (still fused) when flash-attn isn't installed
+    try:
+        model = AutoModelForCausalLM.from_pretrained(
+            model_path, attn_implementation="flash_attention_2", **load_kwargs)
+    except (ImportError, ValueError):
+        model = AutoModelForCausalLM.from_pretrained(
+            model_path, attn_implementation="sdpa", **load_kwargs)
     tokenizer = AutoTokenizer.from_pretrained(model_path)
     
-    # Simple chat interface
+    # Simple chat interface. The conversation's token ids and KV cache
+    # carry across turns, so each generate call only prefills the new
+    # prompt tokens instead of re-encoding the whole history
+    context_ids = None
+    past_key_values = None
+
     while True:
         prompt = input("\nUser: ")
         if prompt.lower() in ["exit", "quit"]:
             break
-            
-        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
-        outputs = model.generate(
-            **inputs,
-            max_new_tokens=args.max_tokens,
-            temperature=args.temperature,
-            do_sample=True
-        )
-        
-        response = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        print(f"\nAssistant: {response}")
+
+        new_ids = tokenizer(prompt, return_tensors="pt").input_ids.to(model.device)
+        if context_ids is None:
+            input_ids = new_ids
+        else:
+            input_ids = torch.cat([context_ids, new_ids], dim=-1)
+
+        # Stream tokens as they are generated: generate runs in a worker
+        # thread while this thread prints from the streamer
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True,
+                                        skip_special_tokens=True)
+        result = {}
+
+        def run_generate():
+            result["output"] = model.generate(
+                input_ids=input_ids,
+                max_new_tokens=args.max_tokens,
+                temperature=args.temperature,
+                do_sample=True,
+                use_cache=True,
+                past_key_values=past_key_values,
+                streamer=streamer,
+                return_dict_in_generate=True
+            )
+
+        thread = Thread(target=run_generate)
+        thread.start()
+
+        print("\nAssistant: ", end="", flush=True)
+        for text in streamer:
+            print(text, end="", flush=True)
+        print()
+        thread.join()
+
+        context_ids = result["output"].sequences
+        past_key_values = result["output"].past_key_values
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,59 +1,230 @@
+import functools
 import os
 import hashlib
+import mmap
+import threading
+import time
 from typing import List, Dict
 
+_hf_api = None
+_http_session = None
+_shared_lock = threading.Lock()
+
+def get_hf_api():
+    """Process-wide HfApi instance.
+
+    HfApi keeps one underlying session, so sharing the instance lets
+    every HF call reuse the same TLS connection instead of
+    re-handshaking per construction site.
+    """
+    global _hf_api
+    with _shared_lock:
+        if _hf_api is None:
+            from huggingface_hub import HfApi
+            _hf_api = HfApi()
+        return _hf_api
+
+def get_http_session():
+    """Process-wide requests.Session with HF auth headers for raw calls"""
+    global _http_session
+    with _shared_lock:
+        if _http_session is None:
+            import requests
+            session = requests.Session()
+            try:
+                from huggingface_hub.utils import build_hf_headers
+                session.headers.update(build_hf_headers())
+            except Exception:
+                pass
+            _http_session = session
+        return _http_session
+
+def git_cmd(*args) -> List[str]:
+    """Build a git argv with config tweaks for throwaway clones.
+
+    The bare mirrors this tool creates never use alternates or
+    submodules, so skip the alternate-refs advertisement and submodule
+    recursion on every clone/fetch.
+    """
+    return ["git",
+            "-c", "core.alternateRefsCommand=exit 0",
+            "-c", "submodule.recurse=false"] + list(args)
+
+@functools.lru_cache(maxsize=4096)
+def safe_repo_name(repo_id: str) -> str:
+    """Filesystem-safe name for a repo id (namespace slash -> underscore).
+
+    Cached because the hot download/verify paths mangle the same ids
+    over and over.
+    """
+    return repo_id.replace('/', '_')
+
+class TokenBucket:
+    """Thread-safe token bucket for proactive API rate limiting.
+
+    Keeps request rate under the HF API limit so calls never hit the
+    429-retry path in the first place.
+    """
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate  # tokens refilled per second
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until enough tokens are available, then consume them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
 class RepoManager:
-    def __init__(self, base_dir: str = "deepseek_storage"):
+    def __init__(self, base_dir: str = "deepseek_storage", pool_size: int = None):
         self.base_dir = os.path.abspath(base_dir)
         self.archives_dir = os.path.join(self.base_dir, "archives")
         self.extracted_dir = os.path.join(self.base_dir, "extracted")
+        self.bare_cache_dir = os.path.join(self.base_dir, "bare_cache")
+        self._listing_cache = {}
         self.create_directories()
+        if pool_size:
+            self.configure_http_pool(pool_size)
+
+    def configure_http_pool(self, pool_size: int):
+        """Widen the HTTP connection pool used by huggingface_hub.
+
+        urllib3 defaults to 10 pooled connections; with more concurrent
+        workers than that, each overflow request pays a fresh TCP+TLS
+        handshake. One shared session sized to the worker count keeps
+        connections alive across all HF calls.
+        """
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from huggingface_hub import configure_http_backend
+
+            def backend_factory() -> "requests.Session":
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size,
+                                      pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                return session
+
+            configure_http_backend(backend_factory=backend_factory)
+        except Exception as e:
+            print(f"Warning: could not configure HTTP pool: {str(e)}")
 
     def create_directories(self):
         """Create necessary directories if they don't exist."""
         os.makedirs(self.archives_dir, exist_ok=True)
         os.makedirs(self.extracted_dir, exist_ok=True)
+        os.makedirs(self.bare_cache_dir, exist_ok=True)
+
+    def get_bare_cache_path(self, repo_id: str) -> str:
+        """Persistent bare-clone path shared by download and mirror runs"""
+        return os.path.normpath(
+            os.path.join(self.bare_cache_dir, safe_repo_name(repo_id) + '.git'))
 
     def get_archive_path(self, repo_id: str) -> str:
         """Windows-safe path for repository bundles"""
-        filename = repo_id.replace('/', '_') + '.bundle'
+        filename = safe_repo_name(repo_id) + '.bundle'
         return os.path.normpath(os.path.join(self.archives_dir, filename))
 
     def get_extraction_path(self, repo_id: str) -> str:
         """Windows-safe extraction path"""
-        dirname = repo_id.replace('/', '_')
+        dirname = safe_repo_name(repo_id)
         return os.path.normpath(os.path.join(self.extracted_dir, dirname))
 
     def calculate_file_hash(self, filepath: str) -> str:
         """Calculate SHA256 hash of a file."""
-        sha256_hash = hashlib.sha256()
-        with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
+        # buffering=0 skips the io module's own buffer - we hand OpenSSL
+        # big slices ourselves, so double-buffering is pure copy cost
+        with open(filepath, "rb", buffering=0) as f:
+            try:
+                # Python 3.11+: file_digest loops in C with the GIL
+                # released, feeding OpenSSL's SHA-NI code directly
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            except AttributeError:
+                pass
+            sha256_hash = hashlib.sha256()
+            try:
+                # Feed the whole mapping to OpenSSL in one update so it
+                # can take the hardware-accelerated (SHA-NI) fast path
+                # instead of churning through tiny read() chunks
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    sha256_hash.update(mm)
+            except (ValueError, OSError):
+                # Empty file or platform without mmap support: reuse one
+                # 1 MiB buffer via readinto so each pass avoids allocating
+                # a fresh bytes object
+                buf = bytearray(1 << 20)
+                view = memoryview(buf)
+                while n := f.readinto(buf):
+                    sha256_hash.update(view[:n])
         return sha256_hash.hexdigest()
 
+    def _scan_cached(self, directory: str, build) -> List[str]:
+        """Memoize a directory scan, invalidating on the dir's mtime.
+
+        Verify/extract runs call the listing helpers several times; the
+        directory mtime changes whenever an entry is added or removed,
+        so it doubles as a cheap cache key.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        cached = self._listing_cache.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        result = build(directory)
+        self._listing_cache[directory] = (mtime, result)
+        return result
+
     def get_downloaded_repos(self) -> List[str]:
         """Get list of downloaded repository bundles"""
-        if not os.path.exists(self.archives_dir):
-            return []
-        return [f.replace('.bundle', '').replace('_', '/') 
-                for f in os.listdir(self.archives_dir) 
-                if f.endswith('.bundle')]
+        def build(directory):
+            repos = []
+            # Suffixes stripped by slicing with lengths hoisted out of
+            # the loop - one allocation per entry instead of a replace
+            # chain rescanning the whole name
+            zst_cut = len('.bundle.zst')
+            bundle_cut = len('.bundle')
+            # scandir serves the names straight from the dirents
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.endswith('.bundle.zst'):
+                        name = name[:-zst_cut]
+                    elif name.endswith('.bundle'):
+                        name = name[:-bundle_cut]
+                    else:
+                        continue
+                    repos.append(name.replace('_', '/'))
+            return repos
+        return self._scan_cached(self.archives_dir, build)
 
     def get_extracted_repos(self) -> List[str]:
         """Get list of extracted repositories."""
-        if not os.path.exists(self.extracted_dir):
-            return []
-        return [d.replace('_', '/') 
-                for d in os.listdir(self.extracted_dir)
-                if os.path.isdir(os.path.join(self.extracted_dir, d))]
+        def build(directory):
+            # DirEntry.is_dir comes from the dirent on most filesystems,
+            # so no per-entry stat syscall
+            with os.scandir(directory) as entries:
+                return [entry.name.replace('_', '/') for entry in entries
+                        if entry.is_dir(follow_symlinks=False)]
+        return self._scan_cached(self.extracted_dir, build)
 
     def estimate_repo_size(self, repo_id: str) -> float:
         """Estimate repository size using Hugging Face API"""
         try:
-            from huggingface_hub import HfApi
-            api = HfApi()
-            model_info = api.model_info(repo_id)
+            model_info = get_hf_api().model_info(repo_id)
             return model_info.safetensors or model_info.size
         except:
             return 0.0  # Fallback if API call fails 
\ No newline at end of file
@@ -1,66 +1,102 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import sys
 from typing import List, Dict
 import json
+import shutil
 from pathlib import Path
-import time
+
+# One shared session for every API call and download: keep-alive reuses
+# TCP+TLS connections across requests instead of re-handshaking, and the
+# widened pool covers all download workers
+SESSION = requests.Session()
+# Retry in the transport layer, honoring the server's Retry-After on
+# 429s, instead of throttling proactively with fixed sleeps
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=5, backoff_factor=0.3,
+                      status_forcelist=[429, 502, 503, 504],
+                      respect_retry_after_header=True)))
 
 def get_deepseek_repos(include_size: bool = True) -> List[Dict]:
     """Fetch DeepSeek repositories with optional size information"""
     url = "https://huggingface.co/api/models"
-    params = {"author": "deepseek-ai"}
-    
+    # full=true makes the list endpoint return the size-bearing fields
+    # in a single response instead of one detail GET per repo
+    params = {"author": "deepseek-ai", "full": "true"}
+
     try:
-        response = requests.get(url, params=params)
+        response = SESSION.get(url, params=params)
         response.raise_for_status()
         repos = response.json()
-        
+
         if include_size:
-            # Fetch detailed size information
-            for repo in tqdm(repos, desc="Fetching size information"):
+            def fetch_size(repo):
                 try:
                     detail_url = f"https://huggingface.co/api/models/{repo['modelId']}"
-                    detail_response = requests.get(detail_url)
+                    detail_response = SESSION.get(detail_url)
                     if detail_response.ok:
                         details = detail_response.json()
-                        repo['size'] = details.get('size', 0)
-                    time.sleep(0.5)  # Rate limiting
+                        repo['size'] = details.get('usedStorage',
+                                                   details.get('size', 0))
                 except Exception as e:
                     print(f"Warning: Could not fetch size for {repo['modelId']}: {str(e)}")
-                    repo['size'] = 0
-        
+                repo.setdefault('size', 0)
+
+            # Only repos the list response left without a size need a
+            # detail lookup; those overlap in a pool instead of paying a
+            # serial round-trip (plus the old 0.5 s sleep) per repo
+            missing = [repo for repo in repos if 'size' not in repo]
+            if missing:
+                with ThreadPoolExecutor(max_workers=16) as executor:
+                    list(tqdm(executor.map(fetch_size, missing),
+                              total=len(missing),
+                              desc="Fetching size information"))
+
         return repos
     except requests.exceptions.RequestException as e:
         print(f"Error fetching repository list: {str(e)}")
         sys.exit(1)
 
-def download_repo(repo_id: str, output_dir: str, force: bool = False) -> bool:
+def download_repo(repo_id: str, output_dir: str, force: bool = False,
+                  position: int = 0) -> bool:
     """Download a single repository with proper error handling"""
     download_url = f"https://huggingface.co/{repo_id}/archive/main.tar.gz"
     filename = repo_id.replace('/', '_') + '.tar.gz'
     output_path = os.path.join(output_dir, filename)
-    
+
     if os.path.exists(output_path) and not force:
         print(f"Skipping {repo_id} - already downloaded (use --force to override)")
         return True
-    
+
     try:
-        response = requests.get(download_url, stream=True)
+        response = SESSION.get(download_url, stream=True)
         response.raise_for_status()
-        
+
         total_size = int(response.headers.get('content-length', 0))
-        
+
         # Create temporary file first
         temp_path = output_path + '.tmp'
         with open(temp_path, 'wb') as f:
-            with tqdm(total=total_size, unit='B', unit_scale=True, desc=repo_id) as pbar:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        pbar.update(len(chunk))
+            # wrapattr counts bytes inside tqdm's own write wrapper, and
+            # mininterval/miniters batch the tty redraws by time and
+            # volume, keeping bar bookkeeping off the hot write loop.
+            # position keeps concurrent per-file bars on their own lines
+            with tqdm.wrapattr(f, 'write', total=total_size, unit='B',
+                               unit_scale=True, desc=repo_id,
+                               position=position + 1, leave=False,
+                               mininterval=0.5, miniters=1 << 20) as writer:
+                # copyfileobj shuttles 1 MiB blocks without a Python
+                # callback per chunk; decode_content keeps transparent
+                # gzip handling that iter_content used to provide
+                response.raw.decode_content = True
+                shutil.copyfileobj(response.raw, writer, length=1 << 20)
         
         # Move temporary file to final location
         os.replace(temp_path, output_path)
@@ -72,6 +108,53 @@ def download_repo(repo_id: str, output_dir: str, force: bool = False) -> bool:
             os.remove(temp_path)
         return False
 
+def download_repos_async(repos: List[Dict], output_dir: str, force: bool) -> List[bool]:
+    """Run every download on one event loop via aiohttp.
+
+    A single OS thread sustains all in-flight transfers, so bulk runs of
+    many small repos skip the thread context-switching the pool pays.
+    """
+    import aiohttp
+
+    async def download_one(session, semaphore, repo_id):
+        download_url = f"https://huggingface.co/{repo_id}/archive/main.tar.gz"
+        filename = repo_id.replace('/', '_') + '.tar.gz'
+        output_path = os.path.join(output_dir, filename)
+
+        if os.path.exists(output_path) and not force:
+            print(f"Skipping {repo_id} - already downloaded (use --force to override)")
+            return True
+
+        temp_path = output_path + '.tmp'
+        async with semaphore:
+            try:
+                async with session.get(download_url) as response:
+                    response.raise_for_status()
+                    with open(temp_path, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(1 << 20):
+                            f.write(chunk)
+                os.replace(temp_path, output_path)
+                return True
+            except Exception as e:
+                print(f"\nError downloading {repo_id}: {str(e)}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return False
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(32)
+        connector = aiohttp.TCPConnector(limit=32)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [download_one(session, semaphore, repo['modelId'])
+                     for repo in repos]
+            outcomes = []
+            for coro in tqdm(asyncio.as_completed(tasks), total=len(tasks),
+                             desc="Overall Progress"):
+                outcomes.append(await coro)
+            return outcomes
+
+    return asyncio.run(run_all())
+
 def main():
     parser = argparse.ArgumentParser(description="Download DeepSeek repositories from Hugging Face")
     parser.add_argument("--output-dir", default="deepseek_repos",
@@ -84,6 +167,9 @@ def main():
                       help="List available repositories and their sizes")
     parser.add_argument("--sort", choices=['asc', 'desc'], default='desc',
                       help="Sort repositories by size (when listing)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                      help="Drive downloads from one asyncio event loop "
+                           "(requires aiohttp) instead of the thread pool")
     
     args = parser.parse_args()
     
@@ -131,16 +217,38 @@ def main():
             print("Download cancelled")
             return
     
-    # Download repositories
+    # Download repositories. Each download is dominated by network
+    # latency, so fan out over a small thread pool - handshakes and
+    # transfers overlap instead of paying one RTT chain per repo
     successful = 0
     failed = 0
-    
-    for repo in repos:
-        if download_repo(repo['modelId'], args.output_dir, args.force):
-            successful += 1
-        else:
-            failed += 1
-    
+
+    if args.use_async:
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            print("aiohttp is not installed; falling back to threaded downloads")
+            args.use_async = False
+
+    if args.use_async:
+        outcomes = download_repos_async(repos, args.output_dir, args.force)
+        successful = sum(1 for ok in outcomes if ok)
+        failed = len(outcomes) - successful
+    else:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                executor.submit(download_repo, repo['modelId'], args.output_dir,
+                                args.force, position % 8): repo
+                for position, repo in enumerate(repos)
+            }
+            with tqdm(total=len(futures), desc="Overall Progress", position=0) as pbar:
+                for future in as_completed(futures):
+                    if future.result():
+                        successful += 1
+                    else:
+                        failed += 1
+                    pbar.update(1)
+
     # Print summary
     print("\nDownload Summary:")
     print(f"Successfully downloaded: {successful}")